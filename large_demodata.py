@@ -1,26 +1,50 @@
 """
 Large Demo Data Generator for Production Scheduler
 Generates random large-scale production data for stress testing
-Data changes each time it's called - with varied but achievable deadlines
+Data changes each time it's called (unless a seed is given) - with varied but achievable deadlines
 """
 
 import random
 from datetime import datetime
 
-def get_large_demo_data():
+import numpy as np
+
+from or_tools import aggregate_workload
+
+def _setup_times_from_matrix(products, setup_matrix):
+    """
+    Converts a dense setup matrix (indexed like products) into the
+    "product1-product2" -> hours dict used by the UI and solve_schedule
+    """
+    from_idx, to_idx = np.nonzero(setup_matrix)
+    return {
+        f"{products[i]['name']}-{products[j]['name']}": int(setup_matrix[i, j])
+        for i, j in zip(from_idx.tolist(), to_idx.tolist())
+    }
+
+def get_large_demo_data(seed=None):
     """
     Generates large random demo data for stress testing
     Returns a dictionary with machines, products, setup times, and orders
-    Each call generates different random data
+    ('setup_matrix' holds the same setup times as a dense int32 array)
+    Each call generates different random data; pass a seed for reproducible data
     """
 
+    # Both random sources are seeded from the same value so that a fixed
+    # seed reproduces the exact same problem
+    py_rng = random.Random(seed)
+
     # Configuration for large data
-    NUM_MACHINES = random.randint(8, 15)  # 8-15 machines
-    NUM_PRODUCTS = random.randint(15, 25)  # 15-25 products
-    NUM_ORDERS = random.randint(20, 40)  # 20-40 orders
+    NUM_MACHINES = py_rng.randint(8, 15)  # 8-15 machines
+    NUM_PRODUCTS = py_rng.randint(15, 25)  # 15-25 products
+    NUM_ORDERS = py_rng.randint(20, 40)  # 20-40 orders
     MIN_TASKS_PER_PRODUCT = 3
     MAX_TASKS_PER_PRODUCT = 8
 
+    # Draw per-item randomness in batches up front; the loops below only
+    # index into these lists instead of calling the RNG once per item
+    rng = np.random.default_rng(seed)
+
     print(f"\n[LARGE DEMO DATA GENERATOR]")
     print(f"Generating: {NUM_MACHINES} machines, {NUM_PRODUCTS} products, {NUM_ORDERS} orders")
     print(f"Deadlines: Varied (2-6x minimum time, all achievable)")
@@ -44,12 +68,12 @@ def get_large_demo_data():
 
     for i in range(NUM_MACHINES):
         # Each machine can do 2-4 operations
-        num_ops = random.randint(2, 4)
+        num_ops = py_rng.randint(2, 4)
         machine_ops = operations_pool[i * num_ops_per_machine:(i + 1) * num_ops_per_machine][:num_ops]
 
         # If not enough ops, sample from pool
         if len(machine_ops) < num_ops:
-            additional = random.sample(operations_pool, num_ops - len(machine_ops))
+            additional = py_rng.sample(operations_pool, num_ops - len(machine_ops))
             machine_ops.extend(additional)
 
         operations_per_machine.extend(machine_ops)
@@ -60,22 +84,25 @@ def get_large_demo_data():
         })
 
     # Collect all available operations
-    operations_used = list(set(operations_per_machine))
+    operations_used = list(dict.fromkeys(operations_per_machine))  # Deduplicate, keeping first-seen order
 
     # Generate Products with random task sequences
     # IMPORTANT: Only use operations that machines can perform
+    num_tasks_arr = rng.integers(MIN_TASKS_PER_PRODUCT, MAX_TASKS_PER_PRODUCT + 1, size=NUM_PRODUCTS).tolist()
+    durations = rng.integers(1, 7, size=(NUM_PRODUCTS, MAX_TASKS_PER_PRODUCT)).tolist()  # 1-6 hours
+
     products = []
     for i in range(NUM_PRODUCTS):
-        num_tasks = random.randint(MIN_TASKS_PER_PRODUCT, MAX_TASKS_PER_PRODUCT)
+        num_tasks = num_tasks_arr[i]
 
         # Select random operations ONLY from available operations
         num_to_select = min(num_tasks, len(operations_used))
-        product_operations = random.sample(operations_used, num_to_select)
+        product_operations = py_rng.sample(operations_used, num_to_select)
 
         tasks = []
-        for op in product_operations:
+        for k, op in enumerate(product_operations):
             # Random duration between 1-6 hours
-            duration = random.randint(1, 6)
+            duration = durations[i][k]
             tasks.append({
                 'operation': op,
                 'duration': duration
@@ -87,38 +114,43 @@ def get_large_demo_data():
         })
 
     # Generate Setup Times (product changeovers)
-    setup_times = {}
+    # setup_matrix[from, to] holds the setup hours between product indices
+    setup_matrix = np.zeros((NUM_PRODUCTS, NUM_PRODUCTS), dtype=np.int32)
 
     # Generate setup times for random product pairs (about 40% of all possible pairs)
     num_setup_times = int((NUM_PRODUCTS * (NUM_PRODUCTS - 1)) * 0.4)
+    setup_vals = rng.integers(1, 5, size=num_setup_times)  # Setup time between 1-4 hours
+    from_idx = rng.integers(0, NUM_PRODUCTS, size=num_setup_times)
+    to_idx = rng.integers(0, NUM_PRODUCTS, size=num_setup_times)
 
-    for _ in range(num_setup_times):
-        from_product = random.choice(products)['name']
-        to_product = random.choice(products)['name']
+    # Self-transitions never get a setup time
+    changeover = from_idx != to_idx
+    setup_matrix[from_idx[changeover], to_idx[changeover]] = setup_vals[changeover]
 
-        if from_product != to_product:
-            setup_key = f"{from_product}-{to_product}"
-            # Setup time between 1-4 hours
-            setup_times[setup_key] = random.randint(1, 4)
+    setup_times = _setup_times_from_matrix(products, setup_matrix)
 
     # Generate Orders with VALID, varied deadlines
+    # Set deadlines between 2x and 6x the minimum time (all achievable)
+    # Vary deadlines: 50% tight but achievable (2-3x minimum),
+    # 50% relaxed (3.5-6x minimum)
+    product_choices = rng.integers(0, NUM_PRODUCTS, size=NUM_ORDERS).tolist()
+    quantities = rng.integers(1, 4, size=NUM_ORDERS).tolist()  # 1-3 units per order (reduced for feasibility)
+    deadline_factors = np.where(
+        rng.random(NUM_ORDERS) < 0.5,
+        rng.uniform(2.0, 3.0, size=NUM_ORDERS),
+        rng.uniform(3.5, 6.0, size=NUM_ORDERS)
+    ).tolist()
+
     orders = []
 
     for i in range(NUM_ORDERS):
-        product = random.choice(products)
-        quantity = random.randint(1, 3)  # 1-3 units per order (reduced for feasibility)
+        product = products[product_choices[i]]
+        quantity = quantities[i]
 
         # Calculate minimum time needed for this order (sequential processing)
         total_task_time = sum(task['duration'] for task in product['tasks']) * quantity
 
-        # Set deadlines between 2x and 6x the minimum time (all achievable)
-        # Vary deadlines: some tight (2-3x), some relaxed (4-6x)
-        if random.random() < 0.5:
-            # 50% tight but achievable deadlines (2-3x minimum)
-            deadline = int(total_task_time * random.uniform(2.0, 3.0))
-        else:
-            # 50% relaxed deadlines (3.5-6x minimum)
-            deadline = int(total_task_time * random.uniform(3.5, 6.0))
+        deadline = int(total_task_time * deadline_factors[i])
 
         # Ensure minimum deadline of 30 hours
         deadline = max(deadline, 30)
@@ -130,31 +162,39 @@ def get_large_demo_data():
         })
 
     # Print statistics
-    total_tasks = sum(len(p['tasks']) * sum(o['quantity'] for o in orders if o['product'] == p['name'])
-                     for p in products)
+    qty_per_product, _, total_tasks = aggregate_workload(products, orders)
     print(f"Total tasks to schedule: ~{total_tasks}")
     print(f"Setup times defined: {len(setup_times)}")
     print(f"Average tasks per product: {sum(len(p['tasks']) for p in products) / len(products):.1f}")
-    print(f"Total units to produce: {sum(o['quantity'] for o in orders)}")
+    print(f"Total units to produce: {sum(qty_per_product.values())}")
     print("-" * 60)
 
     return {
         'machines': machines,
         'products': products,
         'setup_times': setup_times,
+        'setup_matrix': setup_matrix,
         'orders': orders
     }
 
 
-def get_extreme_large_demo_data():
+def get_extreme_large_demo_data(seed=None):
     """
     Generates extremely large data for maximum stress testing
+    Pass a seed for reproducible data
     WARNING: May take significant time to solve (30+ seconds or may timeout)
     """
 
-    NUM_MACHINES = random.randint(20, 30)  # 20-30 machines
-    NUM_PRODUCTS = random.randint(40, 60)  # 40-60 products
-    NUM_ORDERS = random.randint(60, 100)  # 60-100 orders
+    py_rng = random.Random(seed)
+
+    NUM_MACHINES = py_rng.randint(20, 30)  # 20-30 machines
+    NUM_PRODUCTS = py_rng.randint(40, 60)  # 40-60 products
+    NUM_ORDERS = py_rng.randint(60, 100)  # 60-100 orders
+    MIN_TASKS_PER_PRODUCT = 3
+    MAX_TASKS_PER_PRODUCT = 10
+
+    # Batched randomness, indexed by the loops below
+    rng = np.random.default_rng(seed)
 
     print(f"\n[EXTREME LARGE DEMO DATA GENERATOR]")
     print(f"⚠️  WARNING: This will generate EXTREME data!")
@@ -179,11 +219,11 @@ def get_extreme_large_demo_data():
     num_ops_per_machine = max(2, len(operations_pool) // NUM_MACHINES + 1)
 
     for i in range(NUM_MACHINES):
-        num_ops = random.randint(2, 5)
+        num_ops = py_rng.randint(2, 5)
         machine_ops = operations_pool[i * num_ops_per_machine:(i + 1) * num_ops_per_machine][:num_ops]
 
         if len(machine_ops) < num_ops:
-            additional = random.sample(operations_pool, num_ops - len(machine_ops))
+            additional = py_rng.sample(operations_pool, num_ops - len(machine_ops))
             machine_ops.extend(additional)
 
         operations_per_machine.extend(machine_ops)
@@ -193,18 +233,21 @@ def get_extreme_large_demo_data():
             'operations': machine_ops
         })
 
-    operations_used = list(set(operations_per_machine))
+    operations_used = list(dict.fromkeys(operations_per_machine))  # Deduplicate, keeping first-seen order
 
     # Generate products using ONLY available operations
+    num_tasks_arr = rng.integers(MIN_TASKS_PER_PRODUCT, MAX_TASKS_PER_PRODUCT + 1, size=NUM_PRODUCTS).tolist()
+    durations = rng.integers(1, 9, size=(NUM_PRODUCTS, MAX_TASKS_PER_PRODUCT)).tolist()  # 1-8 hours
+
     products = []
     for i in range(NUM_PRODUCTS):
-        num_tasks = random.randint(3, 10)
+        num_tasks = num_tasks_arr[i]
         num_to_select = min(num_tasks, len(operations_used))
-        product_operations = random.sample(operations_used, num_to_select)
+        product_operations = py_rng.sample(operations_used, num_to_select)
 
         tasks = []
-        for op in product_operations:
-            duration = random.randint(1, 8)
+        for k, op in enumerate(product_operations):
+            duration = durations[i][k]
             tasks.append({
                 'operation': op,
                 'duration': duration
@@ -215,32 +258,36 @@ def get_extreme_large_demo_data():
             'tasks': tasks
         })
 
-    setup_times = {}
+    setup_matrix = np.zeros((NUM_PRODUCTS, NUM_PRODUCTS), dtype=np.int32)
     num_setup_times = int((NUM_PRODUCTS * (NUM_PRODUCTS - 1)) * 0.3)
+    setup_vals = rng.integers(1, 6, size=num_setup_times)  # 1-5 hours
+    from_idx = rng.integers(0, NUM_PRODUCTS, size=num_setup_times)
+    to_idx = rng.integers(0, NUM_PRODUCTS, size=num_setup_times)
 
-    for _ in range(num_setup_times):
-        from_product = random.choice(products)['name']
-        to_product = random.choice(products)['name']
+    changeover = from_idx != to_idx
+    setup_matrix[from_idx[changeover], to_idx[changeover]] = setup_vals[changeover]
 
-        if from_product != to_product:
-            setup_key = f"{from_product}-{to_product}"
-            setup_times[setup_key] = random.randint(1, 5)
+    setup_times = _setup_times_from_matrix(products, setup_matrix)
 
     # Generate Orders with VALID, varied deadlines
+    # Set deadlines between 2x and 7x the minimum time (all achievable):
+    # 50% tight but achievable (2-3.5x minimum), 50% relaxed (4-7x minimum)
+    product_choices = rng.integers(0, NUM_PRODUCTS, size=NUM_ORDERS).tolist()
+    quantities = rng.integers(1, 4, size=NUM_ORDERS).tolist()  # 1-3 units per order (reduced for feasibility)
+    deadline_factors = np.where(
+        rng.random(NUM_ORDERS) < 0.5,
+        rng.uniform(2.0, 3.5, size=NUM_ORDERS),
+        rng.uniform(4.0, 7.0, size=NUM_ORDERS)
+    ).tolist()
+
     orders = []
     for i in range(NUM_ORDERS):
-        product = random.choice(products)
-        quantity = random.randint(1, 3)  # 1-3 units per order (reduced for feasibility)
+        product = products[product_choices[i]]
+        quantity = quantities[i]
 
         total_task_time = sum(task['duration'] for task in product['tasks']) * quantity
 
-        # Set deadlines between 2x and 6x the minimum time (all achievable)
-        if random.random() < 0.5:
-            # 50% tight but achievable deadlines (2-3.5x minimum)
-            deadline = int(total_task_time * random.uniform(2.0, 3.5))
-        else:
-            # 50% relaxed deadlines (4-7x minimum)
-            deadline = int(total_task_time * random.uniform(4.0, 7.0))
+        deadline = int(total_task_time * deadline_factors[i])
 
         deadline = max(deadline, 40)  # Minimum 40 hours for extreme data
 
@@ -250,8 +297,7 @@ def get_extreme_large_demo_data():
             'deadline': deadline
         })
 
-    total_tasks = sum(len(p['tasks']) * sum(o['quantity'] for o in orders if o['product'] == p['name'])
-                     for p in products)
+    qty_per_product, _, total_tasks = aggregate_workload(products, orders)
     print(f"Total tasks to schedule: ~{total_tasks}")
     print(f"Setup times defined: {len(setup_times)}")
     print("-" * 60)
@@ -260,5 +306,6 @@ def get_extreme_large_demo_data():
         'machines': machines,
         'products': products,
         'setup_times': setup_times,
+        'setup_matrix': setup_matrix,
         'orders': orders
     }
@@ -13,10 +13,173 @@ The solver minimizes: makespan + 1000 * deadline_violations
 """
 
 from ortools.sat.python import cp_model
-from datetime import datetime
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+import hashlib
+import heapq
+import json
+import os
+import threading
+
+import numpy as np
+
+# CP-SAT variable names only matter when inspecting the model or its logs.
+# Formatting one per variable is measurable on large models, so variables
+# are left unnamed unless CPSAT_NAME_VARS=1 is set in the environment.
+_VAR_NAMES = os.environ.get('CPSAT_NAME_VARS') == '1'
+
+# The per-worker search log is serialized and slows down a parallel search,
+# so it is only printed when CPSAT_LOG_SEARCH=1 is set.
+_LOG_SEARCH = os.environ.get('CPSAT_LOG_SEARCH') == '1'
+
+# Solved schedules keyed by a hash of the problem inputs, least recently
+# used first. Entries hold relative hours only, so one entry serves any
+# production start time. Only OPTIMAL results are stored: a schedule cut off
+# by the time limit could still improve if the same inputs are solved again.
+# Flask and Streamlit serve requests on separate threads, so every access
+# goes through _SCHEDULE_CACHE_LOCK.
+_SCHEDULE_CACHE = OrderedDict()
+_SCHEDULE_CACHE_SIZE = 32
+_SCHEDULE_CACHE_LOCK = threading.Lock()
+
+
+def aggregate_workload(products, orders):
+    """
+    Aggregates the ordered workload in one pass over the orders.
+
+    Args:
+        products: Iterable of product dicts with 'name' and 'tasks'
+        orders: List of dicts with 'product' and 'quantity'
+
+    Returns:
+        Tuple (qty_per_product, total_work, total_tasks) where qty_per_product
+        is a Counter of units ordered per product name, total_work is the
+        summed task duration in hours and total_tasks the number of task
+        instances over all ordered units. Orders for unknown products only
+        appear in qty_per_product.
+    """
+    qty_per_product = Counter()
+    for order in orders:
+        qty_per_product[order['product']] += order['quantity']
 
+    total_work = 0
+    total_tasks = 0
+    for product in products:
+        quantity = qty_per_product[product['name']]
+        total_work += sum(task['duration'] for task in product['tasks']) * quantity
+        total_tasks += len(product['tasks']) * quantity
 
-def solve_schedule(machines, products, setup_times, orders, start_time):
+    return qty_per_product, total_work, total_tasks
+
+
+def _problem_key(machines, products, setup_times, orders, setup_matrix):
+    """
+    Hashes the solver inputs into a schedule cache key. The start time is not
+    part of the key since cached schedules are stored in relative hours.
+    """
+    payload = json.dumps({
+        'machines': machines,
+        'products': products,
+        'setup_times': setup_times,
+        'orders': orders,
+        'setup_matrix': None if setup_matrix is None else np.asarray(setup_matrix).tolist()
+    }, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def _rehydrate(cached, start_datetime):
+    """
+    Builds a fresh solve_schedule result from a cached one, converting its
+    relative hours into datetimes from start_datetime.
+    """
+    schedule = []
+    for task in cached['schedule']:
+        actual_start = start_datetime + timedelta(hours=task['start'])
+        actual_end = start_datetime + timedelta(hours=task['end'])
+        schedule.append({
+            'task_id': task['task_id'],
+            'order': task['order'],
+            'operation': task['operation'],
+            'machine': task['machine'],
+            'start': task['start'],
+            'end': task['end'],
+            'duration': task['duration'],
+            'start_datetime': actual_start.strftime('%Y-%m-%d %H:%M'),
+            'end_datetime': actual_end.strftime('%Y-%m-%d %H:%M'),
+            'setup_time': task['setup_time']
+        })
+
+    return {
+        'status': cached['status'],
+        'makespan': cached['makespan'],
+        'schedule': schedule,
+        'start_datetime': start_datetime.strftime('%Y-%m-%d %H:%M'),
+        'deadline_violations': [dict(v) for v in cached['deadline_violations']],
+        'total_violation_hours': cached['total_violation_hours']
+    }
+
+
+def _edf_hint_schedule(order_info, task_prev, task_machine_idx, task_product_idx,
+                       task_duration, setup_rows, num_machines):
+    """
+    Builds a greedy Earliest-Deadline-First list schedule used as a solver hint.
+
+    Repeatedly places the ready task (its unit predecessor already placed)
+    that can start earliest on its machine, breaking ties by the earliest
+    order deadline. Setup times are applied on product changes, so the
+    result satisfies all hard constraints of the model.
+
+    Returns:
+        Tuple (hint_start, hint_end) of lists indexed by task_id
+    """
+    num_tasks = len(task_duration)
+    hint_start = [0] * num_tasks
+    hint_end = [0] * num_tasks
+    machine_ready = [0] * num_machines  # Time each machine becomes free
+    machine_product = [-1] * num_machines  # Product of the last task on each machine
+
+    # Deadline and unit successor of each task
+    task_deadline = [0] * num_tasks
+    task_next = [-1] * num_tasks
+    for oinfo in order_info.values():
+        for k in oinfo['task_ids']:
+            task_deadline[k] = oinfo['deadline']
+            if task_prev[k] >= 0:
+                task_next[task_prev[k]] = k
+
+    def earliest_start(k):
+        m = task_machine_idx[k]
+        start = machine_ready[m]
+        if machine_product[m] >= 0 and machine_product[m] != task_product_idx[k]:
+            start += setup_rows[machine_product[m]][task_product_idx[k]]
+        if task_prev[k] >= 0:
+            start = max(start, hint_end[task_prev[k]])
+        return start
+
+    # Heap of ready tasks keyed by (earliest start, deadline, task_id).
+    # Keys go stale when a machine gets busier; stale entries are re-pushed.
+    ready = [(earliest_start(k), task_deadline[k], k) for k in range(num_tasks) if task_prev[k] < 0]
+    heapq.heapify(ready)
+    while ready:
+        start, deadline, k = heapq.heappop(ready)
+        current = earliest_start(k)
+        if current != start:
+            heapq.heappush(ready, (current, deadline, k))
+            continue
+
+        m = task_machine_idx[k]
+        hint_start[k] = start
+        hint_end[k] = start + task_duration[k]
+        machine_ready[m] = hint_end[k]
+        machine_product[m] = task_product_idx[k]
+
+        if task_next[k] >= 0:
+            heapq.heappush(ready, (earliest_start(task_next[k]), task_deadline[task_next[k]], task_next[k]))
+
+    return hint_start, hint_end
+
+
+def solve_schedule(machines, products, setup_times, orders, start_time, setup_matrix=None):
     """
     Solves the production scheduling problem using CP-SAT solver.
 
@@ -26,9 +189,17 @@ def solve_schedule(machines, products, setup_times, orders, start_time):
         setup_times: Dict mapping "product1-product2" to setup time in hours
         orders: List of dicts with 'product', 'quantity', and 'deadline' (in hours)
         start_time: Production start datetime (ISO string or datetime object)
+        setup_matrix: Optional dense array of setup hours, setup_matrix[from, to].
+                      Row/column i is the i-th distinct product name in
+                      products (repeated names keep their first position),
+                      so the shape must be (distinct products, distinct
+                      products). Built from setup_times when not given.
 
     Returns:
         Dict with 'status', 'makespan', 'schedule', and violation information
+
+    Raises:
+        ValueError: If setup_matrix does not match the distinct product names
     """
 
     print("\n[API CALL] solve_schedule function called")
@@ -50,14 +221,59 @@ def solve_schedule(machines, products, setup_times, orders, start_time):
     else:
         start_datetime = datetime.now()
 
+    # Identical inputs were already solved: reuse that schedule instead of
+    # running the solver again
+    cache_key = _problem_key(machines, products, setup_times, orders, setup_matrix)
+    with _SCHEDULE_CACHE_LOCK:
+        cached = _SCHEDULE_CACHE.get(cache_key)
+        if cached is not None:
+            _SCHEDULE_CACHE.move_to_end(cache_key)
+    if cached is not None:
+        print("[CACHE HIT] Reusing solved schedule for identical inputs")
+        return _rehydrate(cached, start_datetime)
+
     # ========================================================================
     # STEP 3: Initialize Data Structures
     # ========================================================================
-    all_tasks = []  # Master list of all tasks with their CP variables
-    task_vars = {}  # Quick lookup: task_id -> task info
-    machine_tasks = {m['name']: [] for m in machines}  # Tasks grouped by machine for no-overlap constraints
+    machine_tasks = {m['name']: [] for m in machines}  # Task ids grouped by machine for no-overlap constraints
     order_info = {}  # Track order completion times and deadline violations
 
+    # Lookup tables built once so task creation does not rescan the inputs
+    # First match wins, as with the previous linear searches
+    # product name -> product definition (recipe)
+    product_by_name = {}
+    for p in products:
+        product_by_name.setdefault(p['name'], p)
+
+    # operation -> first machine capable of performing it
+    machine_for_op = {}
+    for m in machines:
+        for op in m['operations']:
+            machine_for_op.setdefault(op, m)
+
+    # Integer ids for products and machines, used by the task columns below
+    product_idx = {name: i for i, name in enumerate(product_by_name)}
+    machine_idx = {name: i for i, name in enumerate(machine_tasks)}
+
+    # Dense setup matrix: setup_matrix[from_product, to_product] in hours
+    # Integer indexing replaces building and hashing "from-to" string keys
+    if setup_matrix is None:
+        setup_matrix = np.zeros((len(product_idx), len(product_idx)), dtype=np.int32)
+        if setup_times:
+            for from_name, i in product_idx.items():
+                for to_name, j in product_idx.items():
+                    setup_matrix[i, j] = setup_times.get(f"{from_name}-{to_name}", 0)
+    else:
+        setup_matrix = np.asarray(setup_matrix, dtype=np.int32)
+        # A mismatch would otherwise surface as an IndexError inside the
+        # circuit loop, or silently shift rows when product names repeat
+        expected_shape = (len(product_idx), len(product_idx))
+        if setup_matrix.shape != expected_shape:
+            raise ValueError(
+                f"setup_matrix has shape {setup_matrix.shape}, expected "
+                f"{expected_shape} (one row/column per distinct product name)"
+            )
+
     # ========================================================================
     # STEP 4: Calculate Time Horizon
     # ========================================================================
@@ -66,21 +282,33 @@ def solve_schedule(machines, products, setup_times, orders, start_time):
     # - Parallel execution on multiple machines
     # - Setup times between product changes
     # - Buffer for optimization flexibility
-    total_work = sum(
-        sum(task['duration'] for task in product['tasks']) *
-        sum(order['quantity'] for order in orders if order['product'] == product['name'])
-        for product in products
-    )
+    qty_per_product, total_work, _ = aggregate_workload(product_by_name.values(), orders)
     horizon = max(1000, int(total_work * 3))
     print(f"Total work: {total_work}h, Horizon set to: {horizon}h")
 
     # ========================================================================
     # STEP 5: Initialize Task Tracking
     # ========================================================================
-    task_id = 0  # Unique identifier for each task instance
-
-    # Track tasks by machine for setup time constraints
-    machine_last_product = {m['name']: [] for m in machines}
+    task_id = 0  # Unique identifier for each task instance, also its list index
+
+    # The exact task count is known up front, so task storage is preallocated
+    # and filled by task_id rather than grown one append at a time
+    # (tasks whose operation no machine can perform are skipped below)
+    expected_tasks = sum(
+        sum(1 for task in p['tasks'] if task['operation'] in machine_for_op) * qty_per_product[name]
+        for name, p in product_by_name.items()
+    )
+    all_tasks = [None] * expected_tasks  # Master list of all tasks with their CP variables
+
+    # Per-task columns (structure of arrays), indexed by task_id.
+    # all_tasks keeps only the CP variables; every other task attribute lives
+    # here, with strings resolved from the indices when building the output.
+    task_machine_idx = [0] * expected_tasks
+    task_product_idx = [0] * expected_tasks
+    task_duration = [0] * expected_tasks
+    task_operation = [None] * expected_tasks
+    all_ends = [None] * expected_tasks  # End variables, fed to the makespan
+    task_prev = [-1] * expected_tasks  # Previous task of the same unit (-1 for the first)
 
     # ========================================================================
     # STEP 6: Create Tasks and Variables for Each Order
@@ -95,7 +323,7 @@ def solve_schedule(machines, products, setup_times, orders, start_time):
         deadline = order['deadline']
 
         # Find the product definition (recipe) for this order
-        product = next((p for p in products if p['name'] == product_name), None)
+        product = product_by_name.get(product_name)
         if not product:
             continue  # Skip if product doesn't exist
 
@@ -104,16 +332,18 @@ def solve_schedule(machines, products, setup_times, orders, start_time):
         # ====================================================================
         # We allow deadline violations but heavily penalize them in the objective
         # order_violation = hours late (0 if on time)
-        order_violation = model.NewIntVar(0, horizon, f'order_violation_{order_id}')
+        order_violation = model.NewIntVar(0, horizon, f'order_violation_{order_id}' if _VAR_NAMES else '')
 
         # Track order information for later violation reporting
-        order_info[order_id] = {
+        order_entry = order_info[order_id] = {
             'product': product_name,
             'deadline': deadline,
             'quantity': quantity,
             'violation_var': order_violation,
-            'last_task_end': None  # Will be set to the end time of the last task
+            'last_task_end': None,  # Will be set to the end time of the last task
+            'task_ids': None  # Will be set to the range of this order's task ids
         }
+        first_task_id = task_id
 
         # ====================================================================
         # Create Tasks for Each Unit in the Order
@@ -121,8 +351,14 @@ def solve_schedule(machines, products, setup_times, orders, start_time):
         # If quantity=3, we create 3 separate instances of all tasks for this product
         # Note: We use _ as the loop variable since we only need to iterate quantity times
 
+        # Sequential work of one unit, counting only tasks a machine can perform
+        unit_work = sum(t['duration'] for t in product['tasks'] if t['operation'] in machine_for_op)
+
+        last_task_end = None  # End of the order's final task
         for _ in range(quantity):
             prev_task_end = None  # Track previous task end for precedence constraints
+            prev_task_id = -1
+            work_before = 0  # Duration of this unit's tasks before the current one
 
             # Iterate through each task in the product's recipe
             for task in product['tasks']:
@@ -130,24 +366,34 @@ def solve_schedule(machines, products, setup_times, orders, start_time):
                 duration = task['duration']
 
                 # Find a machine capable of performing this operation
-                machine = next((m for m in machines if operation in m['operations']), None)
+                machine = machine_for_op.get(operation)
                 if not machine:
                     continue  # Skip if no machine can perform this operation
 
                 # ============================================================
                 # CREATE CP-SAT VARIABLES
                 # ============================================================
-                # Each task needs three variables for OR-Tools:
-
-                # 1. start_var: When the task begins [0, horizon]
-                start_var = model.NewIntVar(0, horizon, f'start_{task_id}')
-
-                # 2. end_var: When the task finishes [0, horizon]
-                end_var = model.NewIntVar(0, horizon, f'end_{task_id}')
+                # Each task needs three variables for OR-Tools.
+                #
+                # Domains are tightened from [0, horizon] using the unit's own
+                # task chain: a task cannot start before its predecessors'
+                # durations have elapsed, and must end early enough for its
+                # successors to finish by the horizon. Smaller domains let
+                # CP-SAT propagate bounds with fewer conflicts.
+                earliest_start = work_before
+                latest_end = horizon - (unit_work - work_before - duration)
+
+                # 1. start_var: When the task begins [earliest_start, latest_end - duration]
+                start_var = model.NewIntVar(earliest_start, latest_end - duration,
+                                            f'start_{task_id}' if _VAR_NAMES else '')
+
+                # 2. end_var: When the task finishes [earliest_start + duration, latest_end]
+                end_var = model.NewIntVar(earliest_start + duration, latest_end,
+                                          f'end_{task_id}' if _VAR_NAMES else '')
 
                 # 3. interval_var: Represents the task as an interval [start, start+duration]
                 #    This is used for no-overlap constraints
-                interval_var = model.NewIntervalVar(start_var, duration, end_var, f'interval_{task_id}')
+                interval_var = model.NewIntervalVar(start_var, duration, end_var, f'interval_{task_id}' if _VAR_NAMES else '')
 
                 # ============================================================
                 # PRECEDENCE CONSTRAINT
@@ -162,33 +408,36 @@ def solve_schedule(machines, products, setup_times, orders, start_time):
                 # ============================================================
                 task_info = {
                     'id': task_id,
-                    'order': order['product'],
-                    'operation': operation,
-                    'machine': machine['name'],
                     'start': start_var,
                     'end': end_var,
-                    'interval': interval_var,
-                    'duration': duration,
-                    'product': product_name,
-                    'order_id': order_id
+                    'interval': interval_var
                 }
 
-                all_tasks.append(task_info)
-                task_vars[task_id] = task_info
-                machine_tasks[machine['name']].append(task_info)
-                machine_last_product[machine['name']].append(task_info)
+                all_tasks[task_id] = task_info
+                all_ends[task_id] = end_var
+                task_machine_idx[task_id] = machine_idx[machine['name']]
+                task_product_idx[task_id] = product_idx[product_name]
+                task_duration[task_id] = duration
+                task_operation[task_id] = operation
+                task_prev[task_id] = prev_task_id
+                machine_tasks[machine['name']].append(task_id)
 
                 # Update for next iteration
                 prev_task_end = end_var
-                order_info[order_id]['last_task_end'] = end_var  # Track last task
+                prev_task_id = task_id
+                work_before += duration
+                last_task_end = end_var
                 task_id += 1
 
+        order_entry['last_task_end'] = last_task_end  # Track last task
+        order_entry['task_ids'] = range(first_task_id, task_id)
+
         # ====================================================================
         # SOFT DEADLINE CONSTRAINT
         # ====================================================================
         # Constraint: last_task_end <= deadline + violation
         # If we finish late, violation will be > 0 (penalized in objective)
-        model.Add(order_info[order_id]['last_task_end'] <= deadline + order_violation)
+        model.Add(order_entry['last_task_end'] <= deadline + order_violation)
 
         order_id += 1
 
@@ -198,50 +447,60 @@ def solve_schedule(machines, products, setup_times, orders, start_time):
     # NO-OVERLAP: Ensures that no two tasks run simultaneously on the same machine
     # SETUP TIMES: Add minimum gap between tasks when switching products
     #
-    # Strategy: Use efficient conditional constraints for setup times
-    # Only create constraints for task pairs with non-zero setup times
-
-    for machine_name, tasks in machine_tasks.items():
-        if len(tasks) > 0:
-            # Extract interval variables for all tasks on this machine
-            intervals = [t['interval'] for t in tasks]
-
-            # Add the no-overlap constraint: no two intervals can overlap in time
-            model.AddNoOverlap(intervals)
+    # Strategy: Sequence-dependent setups are modelled as a routing problem.
+    # Each machine gets a circuit over a dummy depot node (0) plus one node
+    # per task. The circuit literal on arc i -> j is true when task j directly
+    # follows task i, and only then is the setup gap i -> j enforced. The
+    # circuit puts the machine's tasks in a single sequence, so it also acts
+    # as the no-overlap constraint and uses CP-SAT's dedicated circuit
+    # propagator instead of pairwise reified "is before" booleans.
+
+    setup_rows = setup_matrix.tolist()  # Plain ints for the per-arc lookups below
+
+    for machine_name, task_ids in machine_tasks.items():
+        if len(task_ids) > 0:
+            tasks = [all_tasks[k] for k in task_ids]
+
+            # Setup hours between the products present on this machine
+            # (same-product transitions never need a setup)
+            task_products = [task_product_idx[k] for k in task_ids]
+            machine_products = sorted(set(task_products))
+            machine_setups = setup_matrix[np.ix_(machine_products, machine_products)].copy()
+            np.fill_diagonal(machine_setups, 0)
+
+            if len(tasks) < 2 or not machine_setups.any():
+                # No product transition on this machine has a setup time:
+                # a plain no-overlap constraint is enough to order the tasks
+                model.AddNoOverlap([t['interval'] for t in tasks])
+                continue
 
             # ================================================================
-            # Add Setup Time Constraints (Efficient Method)
+            # Add Setup Time Constraints (Circuit Method)
             # ================================================================
-            # For each pair of tasks on the same machine, if they have
-            # different products with a defined setup time, enforce a minimum
-            # gap between them using conditional constraints
-
-            if len(tasks) > 1 and setup_times:
-                for i in range(len(tasks)):
-                    for j in range(i + 1, len(tasks)):  # Only check j > i to reduce constraints
-                        task_i = tasks[i]
-                        task_j = tasks[j]
-
-                        # Check both directions for setup times
-                        setup_key_ij = f"{task_i['product']}-{task_j['product']}"
-                        setup_key_ji = f"{task_j['product']}-{task_i['product']}"
-
-                        setup_time_ij = setup_times.get(setup_key_ij, 0)
-                        setup_time_ji = setup_times.get(setup_key_ji, 0)
-
-                        # Only add constraints if setup time exists
-                        if setup_time_ij > 0:
-                            # If task_i comes before task_j: j.start >= i.end + setup_time_ij
-                            # Create boolean: does task_i precede task_j?
-                            i_before_j = model.NewBoolVar(f'setup_{task_i["id"]}_before_{task_j["id"]}')
-                            model.Add(task_j['start'] >= task_i['end'] + setup_time_ij).OnlyEnforceIf(i_before_j)
-                            model.Add(task_j['start'] < task_i['start']).OnlyEnforceIf(i_before_j.Not())
-
-                        if setup_time_ji > 0 and task_i['product'] != task_j['product']:
-                            # If task_j comes before task_i: i.start >= j.end + setup_time_ji
-                            j_before_i = model.NewBoolVar(f'setup_{task_j["id"]}_before_{task_i["id"]}')
-                            model.Add(task_i['start'] >= task_j['end'] + setup_time_ji).OnlyEnforceIf(j_before_i)
-                            model.Add(task_i['start'] < task_j['start']).OnlyEnforceIf(j_before_i.Not())
+            arcs = []
+            for i, task_i in enumerate(tasks, start=1):
+                # Depot arcs: task_i is the first / last task on the machine
+                arcs.append((0, i, model.NewBoolVar(f'first_{task_i["id"]}' if _VAR_NAMES else '')))
+                arcs.append((i, 0, model.NewBoolVar(f'last_{task_i["id"]}' if _VAR_NAMES else '')))
+
+                for j, task_j in enumerate(tasks, start=1):
+                    if i == j:
+                        continue
+
+                    # Setup time only applies when switching products
+                    setup_time_ij = 0
+                    p_i, p_j = task_products[i - 1], task_products[j - 1]
+                    if p_i != p_j:
+                        setup_time_ij = setup_rows[p_i][p_j]
+
+                    # If task_j directly follows task_i: j.start >= i.end + setup_time_ij
+                    # The gap is posted even when the setup is 0 so that the
+                    # circuit order always matches the actual time order
+                    i_to_j = model.NewBoolVar(f'setup_{task_i["id"]}_to_{task_j["id"]}' if _VAR_NAMES else '')
+                    model.Add(task_j['start'] >= task_i['end'] + setup_time_ij).OnlyEnforceIf(i_to_j)
+                    arcs.append((i, j, i_to_j))
+
+            model.AddCircuit(arcs)
 
     # ========================================================================
     # STEP 8: Define Makespan and Objective Function
@@ -253,9 +512,6 @@ def solve_schedule(machines, products, setup_times, orders, start_time):
         # Create a variable to represent the makespan
         makespan = model.NewIntVar(0, horizon, 'makespan')
 
-        # Collect all task end times
-        all_ends = [t['end'] for t in all_tasks]
-
         # Constraint: makespan = max(all end times)
         # This built-in constraint efficiently tracks the maximum
         model.AddMaxEquality(makespan, all_ends)
@@ -273,6 +529,31 @@ def solve_schedule(machines, products, setup_times, orders, start_time):
         total_violation = sum(order_info[oid]['violation_var'] for oid in order_info)
         model.Minimize(makespan + 1000 * total_violation)
 
+        # ====================================================================
+        # SEARCH STRATEGY
+        # ====================================================================
+        # With setup circuits, the default search struggles to find a first
+        # solution on large instances. Branching on start times (earliest
+        # first, at their lowest value) builds a greedy list schedule quickly.
+        model.AddDecisionStrategy(
+            [t['start'] for t in all_tasks],
+            cp_model.CHOOSE_LOWEST_MIN,
+            cp_model.SELECT_MIN_VALUE
+        )
+
+        # ====================================================================
+        # SOLUTION HINT
+        # ====================================================================
+        # Warm-start the solver with a greedy Earliest-Deadline-First schedule
+        # so it starts from a feasible region instead of searching from scratch
+        hint_start, hint_end = _edf_hint_schedule(
+            order_info, task_prev, task_machine_idx, task_product_idx,
+            task_duration, setup_rows, len(machine_idx)
+        )
+        for k, t in enumerate(all_tasks):
+            model.AddHint(t['start'], hint_start[k])
+            model.AddHint(t['end'], hint_end[k])
+
     # ========================================================================
     # STEP 9: Configure and Run the Solver
     # ========================================================================
@@ -284,7 +565,11 @@ def solve_schedule(machines, products, setup_times, orders, start_time):
 
     # Configure solver parameters
     solver.parameters.max_time_in_seconds = 60 
-    solver.parameters.log_search_progress = True  # Show solving progress in console
+    solver.parameters.log_search_progress = _LOG_SEARCH  # Show solving progress in console
+    solver.parameters.num_workers = max(1, os.cpu_count() or 1)  # Parallel portfolio search on all cores
+    # Skip root probing: on large models it spends a large share of the time
+    # limit on the circuit arc literals before any worker starts searching
+    solver.parameters.cp_model_probing_level = 0
 
     # Solve the model
     # The solver will search for the optimal solution that satisfies all
@@ -306,72 +591,57 @@ def solve_schedule(machines, products, setup_times, orders, start_time):
     # Extract the solution values from the solver and format for output
 
     if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
-        from datetime import timedelta
-
         # ====================================================================
         # Extract Schedule from Solver Solution
         # ====================================================================
         # The solver has assigned values to all our decision variables
         # We now extract those values to create the final schedule
 
+        # Solved start/end times as integer columns alongside the task columns
+        num_tasks = len(all_tasks)
+        starts = np.fromiter((solver.Value(t['start']) for t in all_tasks), dtype=np.int64, count=num_tasks)
+        ends = np.fromiter((solver.Value(t['end']) for t in all_tasks), dtype=np.int64, count=num_tasks)
+
+        # Sort tasks by start time for readability (stable: ties keep task order)
+        by_start = np.argsort(starts, kind='stable')
+
+        # ====================================================================
+        # Build Output Schedule and Calculate Setup Times
+        # ====================================================================
+        # Setup times are the transition time between different products
+        # on the same machine. Since tasks are visited in start order, the
+        # previous task seen on a machine is its predecessor there, so setups
+        # are computed in the same single sweep that builds the output.
+        # Datetimes are added by _rehydrate, so the cached copy stays in hours.
+
+        starts_list = starts.tolist()
+        ends_list = ends.tolist()
+        last_product_by_machine = [-1] * len(machine_idx)  # -1: no task yet
+        product_names = list(product_idx)
+        machine_names = list(machine_idx)
+
         schedule = []
-        for task in all_tasks:
-            # Get the solved start and end times for this task
-            task_start_hours = solver.Value(task['start'])
-            task_end_hours = solver.Value(task['end'])
+        for k in by_start.tolist():
+            task = all_tasks[k]
+            task_start_hours = starts_list[k]
+            task_end_hours = ends_list[k]
 
-            # Convert relative hours to actual datetime
-            actual_start = start_datetime + timedelta(hours=task_start_hours)
-            actual_end = start_datetime + timedelta(hours=task_end_hours)
+            m = task_machine_idx[k]
+            prev_product = last_product_by_machine[m]
+            setup_time = setup_rows[prev_product][task_product_idx[k]] if prev_product >= 0 else 0
+            last_product_by_machine[m] = task_product_idx[k]
 
             schedule.append({
                 'task_id': task['id'],
-                'order': task['order'],
-                'operation': task['operation'],
-                'machine': task['machine'],
-                'product': task['product'],  # Temporary, removed later
+                'order': product_names[task_product_idx[k]],
+                'operation': task_operation[k],
+                'machine': machine_names[m],
                 'start': task_start_hours,
                 'end': task_end_hours,
-                'duration': task['duration'],
-                'start_datetime': actual_start.strftime('%Y-%m-%d %H:%M'),
-                'end_datetime': actual_end.strftime('%Y-%m-%d %H:%M'),
-                'setup_time': 0  # Will be calculated below
+                'duration': task_duration[k],
+                'setup_time': setup_time
             })
 
-        # Sort schedule by start time for readability
-        schedule.sort(key=lambda x: x['start'])
-
-        # ====================================================================
-        # Calculate Setup Times (Post-Processing)
-        # ====================================================================
-        # Setup times are the transition time between different products
-        # on the same machine. We calculate this based on the actual sequence.
-
-        # Group tasks by machine
-        machine_schedule = {}
-        for task in schedule:
-            machine = task['machine']
-            if machine not in machine_schedule:
-                machine_schedule[machine] = []
-            machine_schedule[machine].append(task)
-
-        # For each machine, calculate setup times between consecutive tasks
-        for machine, tasks in machine_schedule.items():
-            tasks.sort(key=lambda x: x['start'])  # Ensure chronological order
-            for i in range(len(tasks)):
-                if i > 0:  # If not the first task on this machine
-                    prev_task = tasks[i - 1]
-                    curr_task = tasks[i]
-
-                    # Check if a setup time is defined for this product transition
-                    setup_key = f"{prev_task['product']}-{curr_task['product']}"
-                    setup_time = setup_times.get(setup_key, 0)
-                    curr_task['setup_time'] = setup_time
-
-        # Clean up: remove internal 'product' field from output
-        for task in schedule:
-            task.pop('product', None)
-
         # ====================================================================
         # Calculate Deadline Violations
         # ====================================================================
@@ -408,16 +678,23 @@ def solve_schedule(machines, products, setup_times, orders, start_time):
             result_status = 'OPTIMAL' if status == cp_model.OPTIMAL else 'FEASIBLE'
 
         # ====================================================================
-        # Return Success Result
+        # Cache and Return Success Result
         # ====================================================================
-        result = {
+        cached = {
             'status': result_status,
             'makespan': solver.Value(makespan) if all_tasks else 0,
             'schedule': schedule,
-            'start_datetime': start_datetime.strftime('%Y-%m-%d %H:%M'),
             'deadline_violations': deadline_violations,
             'total_violation_hours': total_violations
         }
+        if status == cp_model.OPTIMAL:
+            with _SCHEDULE_CACHE_LOCK:
+                _SCHEDULE_CACHE[cache_key] = cached
+                _SCHEDULE_CACHE.move_to_end(cache_key)
+                if len(_SCHEDULE_CACHE) > _SCHEDULE_CACHE_SIZE:
+                    _SCHEDULE_CACHE.popitem(last=False)  # Evict the least recently used entry
+
+        result = _rehydrate(cached, start_datetime)
     else:
         # ====================================================================
         # STEP 12: Handle Solver Failure